@@ -6,11 +6,52 @@ Fetches clone traffic data for all repositories and stores it incrementally.
 
 import os
 import json
+import time
+import operator
+import asyncio
+import bisect
+import threading
+from array import array
+from collections import Counter
+from itertools import accumulate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import httpx
+    import h2  # httpx raises ImportError at runtime for http2=True without it
+except ImportError:
+    httpx = None
+
+try:
+    import zstandard
+    ZSTD_ERROR = zstandard.ZstdError
+except ImportError:
+    zstandard = None
+    ZSTD_ERROR = ValueError
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any
 import sys
 
+# Sentinel returned by get_clone_stats when GitHub answers 304 Not Modified
+UNCHANGED = object()
+
+# Pulls all three fields from a traffic-API day entry in one C call
+get_day_fields = operator.itemgetter('timestamp', 'count', 'uniques')
+
 
 class CloneTracker:
     def __init__(self):
@@ -30,123 +71,360 @@ class CloneTracker:
             'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json'
         }
-        
+
+        # Shared session so concurrent requests reuse pooled connections,
+        # with automatic retries on transient errors and rate limiting
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self._repo_lock = threading.Lock()
+
+        # Bound format method: building the traffic URL is one str.format
+        # call per repo instead of re-assembling the f-string each time
+        self._clone_url = ('https://api.github.com/repos/' + self.username + '/{}/traffic/clones').format
+
         # Load existing data
         self.data = self.load_data()
+        self._dirty = False
     
     def load_data(self) -> Dict[str, Any]:
-        """Load existing clone data from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print("⚠️  Warning: Could not parse existing data file, starting fresh")
-        
+        """Load existing clone data, preferring the zstd-compressed variant"""
+        zst_file = self.data_file + '.zst'
+        if zstandard is None and os.path.exists(zst_file):
+            print(f"⚠️  Warning: {zst_file} exists but the zstandard package is not installed; "
+                  f"falling back to {self.data_file}, which may be stale — install zstandard")
+        try:
+            if zstandard is not None and os.path.exists(zst_file):
+                with open(zst_file, 'rb') as f:
+                    raw = zstandard.ZstdDecompressor().decompress(f.read())
+            elif os.path.exists(self.data_file):
+                with open(self.data_file, 'rb') as f:
+                    raw = f.read()
+            else:
+                raw = None
+
+            if raw is not None:
+                data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                self.normalize_repositories(data)
+                return data
+        except (ValueError, ZSTD_ERROR):
+            print("⚠️  Warning: Could not parse existing data file, starting fresh")
+
         # Default structure
         return {
             'repositories': {},
             'cumulative': {},
             'last_updated': None
         }
+
+    @staticmethod
+    def normalize_repositories(data: Dict[str, Any]):
+        """Normalize daily clone data to the parallel-array layout
+
+        Each repo stores {'dates': [...], 'counts': array('I'), 'uniques': array('I')}
+        sorted by date — one compact array per field instead of one dict per day.
+        Legacy files with a dict-of-days layout are converted in place.
+        """
+        for repo_data in data.get('repositories', {}).values():
+            daily = repo_data.get('daily_clones', {})
+            if 'dates' in daily:
+                daily['counts'] = array('I', daily['counts'])
+                daily['uniques'] = array('I', daily['uniques'])
+            else:
+                dates = sorted(daily)
+                repo_data['daily_clones'] = {
+                    'dates': dates,
+                    'counts': array('I', (daily[d]['count'] for d in dates)),
+                    'uniques': array('I', (daily[d]['uniques'] for d in dates))
+                }
     
     def save_data(self):
-        """Save clone data to JSON file"""
+        """Save clone data to JSON file (atomic write via tmp + rename)"""
+        if not self._dirty:
+            print("✅ No new clone data, skipping write")
+            return
+
         self.data['last_updated'] = datetime.now().isoformat()
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
-        print(f"✅ Data saved to {self.data_file}")
+
+        # default=list converts the array('I') columns to JSON lists
+        if orjson is not None:
+            payload = orjson.dumps(self.data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS, default=list)
+        else:
+            payload = json.dumps(self.data, indent=2, default=list).encode()
+
+        # zstd level 3 shrinks the JSON ~4-6x with near-memcpy decode speed
+        if zstandard is not None:
+            target = self.data_file + '.zst'
+            payload = zstandard.ZstdCompressor(level=3).compress(payload)
+        else:
+            target = self.data_file
+
+        tmp_file = target + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, target)
+
+        # The .zst file is now authoritative; drop the plain file so the two
+        # can't diverge (a zstandard-less run would otherwise read stale data)
+        if target != self.data_file and os.path.exists(self.data_file):
+            os.remove(self.data_file)
+
+        print(f"✅ Data saved to {target}")
     
+    def check_rate_limit(self, response):
+        """Sleep until the rate-limit window resets when nearly exhausted"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if remaining is not None and int(remaining) < 5:
+            reset = int(response.headers.get('X-RateLimit-Reset', 0))
+            wait = max(0, reset - time.time()) + 1
+            print(f"⏳ Rate limit nearly exhausted, sleeping {wait:.0f}s")
+            time.sleep(wait)
+
     def get_all_repositories(self):
         """Fetch all repositories for the authenticated user"""
         repos = []
-        page = 1
-        
-        while True:
-            url = f'https://api.github.com/user/repos?per_page=100&page={page}&type=owner'
-            response = requests.get(url, headers=self.headers)
-            
+        url = 'https://api.github.com/user/repos?per_page=100&type=owner'
+
+        # Follow the Link: rel="next" header so the last page terminates the
+        # loop exactly, instead of fetching one extra empty page
+        while url:
+            response = self.session.get(url)
+
             if response.status_code != 200:
                 print(f"❌ Error fetching repositories: {response.status_code}")
                 print(response.json())
                 break
-            
-            page_repos = response.json()
-            if not page_repos:
-                break
-            
-            repos.extend(page_repos)
-            page += 1
-        
+
+            repos.extend(response.json())
+            self.check_rate_limit(response)
+            url = response.links.get('next', {}).get('url')
+
         print(f"📦 Found {len(repos)} repositories")
         return repos
     
-    def get_clone_stats(self, repo_name: str):
-        """Fetch clone statistics for a specific repository"""
-        url = f'https://api.github.com/repos/{self.username}/{repo_name}/traffic/clones'
-        response = requests.get(url, headers=self.headers)
-        
+    def fetch_repo_names_graphql(self):
+        """Fetch repository names via the GraphQL API
+
+        Requests only the name field, so each response is a few KB instead
+        of full repo objects. Returns None on any error so the caller can
+        fall back to the REST listing.
+        """
+        query = '''
+        query($cursor: String) {
+          viewer {
+            repositories(first: 100, ownerAffiliations: OWNER, after: $cursor) {
+              nodes { name }
+              pageInfo { hasNextPage endCursor }
+            }
+          }
+        }
+        '''
+        names = []
+        cursor = None
+
+        while True:
+            response = self.session.post(
+                'https://api.github.com/graphql',
+                json={'query': query, 'variables': {'cursor': cursor}}
+            )
+
+            if response.status_code != 200:
+                print(f"⚠️  GraphQL repository listing failed: {response.status_code}")
+                return None
+
+            payload = response.json()
+            if 'errors' in payload:
+                print(f"⚠️  GraphQL repository listing failed: {payload['errors']}")
+                return None
+
+            repositories = payload['data']['viewer']['repositories']
+            names.extend(node['name'] for node in repositories['nodes'])
+
+            if not repositories['pageInfo']['hasNextPage']:
+                break
+            cursor = repositories['pageInfo']['endCursor']
+
+        print(f"📦 Found {len(names)} repositories")
+        return names
+
+    def get_clone_stats(self, repo_name: str, etag: str = None):
+        """Fetch clone statistics for a specific repository
+
+        Sends a conditional GET when an ETag from a previous run is available,
+        so unchanged repos cost a 304 with no body. Returns (stats, etag) on
+        success, (UNCHANGED, etag) on 304, and (None, None) on error.
+        """
+        url = self._clone_url(repo_name)
+        headers = {'If-None-Match': etag} if etag else None
+        response = self.session.get(url, headers=headers)
+        return self._handle_traffic_response(repo_name, response, etag)
+
+    def _handle_traffic_response(self, repo_name: str, response, etag: str):
+        """Triage a traffic API response (shared by the requests and httpx paths)"""
         if response.status_code == 200:
-            return response.json()
+            return response.json(), response.headers.get('ETag')
+        elif response.status_code == 304:
+            return UNCHANGED, etag
         elif response.status_code == 403:
             print(f"⚠️  No access to clone stats for {repo_name} (might be private without proper permissions)")
-            return None
+            return None, None
         else:
             print(f"⚠️  Error fetching clone stats for {repo_name}: {response.status_code}")
-            return None
+            return None, None
+
+    async def _fetch_all_traffic(self, repo_names):
+        """Fetch every repo's traffic stats multiplexed over one HTTP/2 connection"""
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            limits=httpx.Limits(max_connections=20),
+            timeout=30
+        ) as client:
+            async def fetch(repo_name):
+                etag = self.data['repositories'].get(repo_name, {}).get('etag')
+                headers = {'If-None-Match': etag} if etag else None
+                url = self._clone_url(repo_name)
+                try:
+                    response = await client.get(url, headers=headers)
+                except httpx.HTTPError as exc:
+                    print(f"⚠️  Error fetching clone stats for {repo_name}: {exc}")
+                    return repo_name, etag, None
+                return repo_name, etag, response
+
+            return await asyncio.gather(*(fetch(name) for name in repo_names))
+
+    def fetch_traffic_http2(self, repo_names):
+        """Fetch all repos' traffic concurrently over HTTP/2 and merge the results"""
+        for repo_name, stored_etag, response in asyncio.run(self._fetch_all_traffic(repo_names)):
+            if response is None:
+                continue
+            stats, etag = self._handle_traffic_response(repo_name, response, stored_etag)
+            self.merge_clone_stats(repo_name, stats, etag)
     
     def process_repository(self, repo_name: str):
         """Process clone statistics for a single repository"""
-        stats = self.get_clone_stats(repo_name)
-        
+        stored_etag = self.data['repositories'].get(repo_name, {}).get('etag')
+        stats, etag = self.get_clone_stats(repo_name, stored_etag)
+        self.merge_clone_stats(repo_name, stats, etag)
+
+    def merge_clone_stats(self, repo_name: str, stats, etag: str):
+        """Merge a traffic API payload into the stored data for one repository"""
+        if stats is UNCHANGED:
+            print(f"  = {repo_name}: unchanged since last run")
+            return
+
         if not stats or 'clones' not in stats:
             return
-        
+
         # Initialize repository data if it doesn't exist
-        if repo_name not in self.data['repositories']:
-            self.data['repositories'][repo_name] = {'daily_clones': {}}
-        
-        repo_data = self.data['repositories'][repo_name]
-        
-        # Store daily clone data
-        for clone_day in stats['clones']:
-            date = clone_day['timestamp'][:10]  # Extract YYYY-MM-DD
-            count = clone_day['count']
-            uniques = clone_day['uniques']
-            
-            # Only update if we don't have this date or if the data is newer
-            if date not in repo_data['daily_clones'] or clone_day['count'] > repo_data['daily_clones'][date]['count']:
-                repo_data['daily_clones'][date] = {
-                    'count': count,
-                    'uniques': uniques
+        # (lock guards the check-then-insert when workers race on new repos)
+        with self._repo_lock:
+            if repo_name not in self.data['repositories']:
+                self.data['repositories'][repo_name] = {
+                    'daily_clones': {'dates': [], 'counts': array('I'), 'uniques': array('I')}
                 }
-        
+
+        repo_data = self.data['repositories'][repo_name]
+        if etag and repo_data.get('etag') != etag:
+            repo_data['etag'] = etag
+            self._dirty = True
+
+        # Merge daily clone data into the sorted parallel arrays
+        daily = repo_data['daily_clones']
+        dates, counts, uniques_arr = daily['dates'], daily['counts'], daily['uniques']
+        clones = stats['clones']
+
+        # Bulk fast path: everything in the payload is newer than anything
+        # stored (new repo, or a long gap between runs), so extend wholesale
+        # instead of walking the per-day merge
+        if clones and (not dates or clones[0]['timestamp'][:10] > dates[-1]):
+            dates.extend(cd['timestamp'][:10] for cd in clones)
+            counts.extend(cd['count'] for cd in clones)
+            uniques_arr.extend(cd['uniques'] for cd in clones)
+            self._dirty = True
+            print(f"  ✓ {repo_name}: {len(clones)} days of data")
+            return
+
+        for clone_day in clones:
+            timestamp, count, uniques = get_day_fields(clone_day)
+            date = timestamp[:10]  # Extract YYYY-MM-DD
+
+            # GitHub returns days in order, so appends dominate
+            if not dates or date > dates[-1]:
+                dates.append(date)
+                counts.append(count)
+                uniques_arr.append(uniques)
+                self._dirty = True
+            else:
+                idx = bisect.bisect_left(dates, date)
+                if idx < len(dates) and dates[idx] == date:
+                    # Only update if the data is newer
+                    if count > counts[idx]:
+                        counts[idx] = count
+                        uniques_arr[idx] = uniques
+                        self._dirty = True
+                else:
+                    dates.insert(idx, date)
+                    counts.insert(idx, count)
+                    uniques_arr.insert(idx, uniques)
+                    self._dirty = True
+
         print(f"  ✓ {repo_name}: {len(stats['clones'])} days of data")
     
     def calculate_cumulative_stats(self):
         """Calculate cumulative statistics across all repositories"""
-        cumulative = {}
-        
-        for repo_name, repo_data in self.data['repositories'].items():
-            for date, day_data in repo_data['daily_clones'].items():
-                if date not in cumulative:
-                    cumulative[date] = {'total_clones': 0, 'unique_users': set()}
-                
-                cumulative[date]['total_clones'] += day_data['count']
-                # Note: We can't accurately track unique users across repos
-                # so we'll track unique cloners per repo
-        
-        # Convert to sorted list and calculate running totals
-        sorted_dates = sorted(cumulative.keys())
-        running_total_clones = 0
-        
-        self.data['cumulative'] = {}
-        for date in sorted_dates:
-            running_total_clones += cumulative[date]['total_clones']
-            self.data['cumulative'][date] = {
-                'total_clones': running_total_clones,
-                'daily_clones': cumulative[date]['total_clones']
+        repos = self.data['repositories'].values()
+
+        if np is not None:
+            # Flatten every repo's days into two arrays and let NumPy do the
+            # groupby-sum and running total in C instead of Python dict ops
+            all_dates = [d for rd in repos for d in rd['daily_clones']['dates']]
+            if not all_dates:
+                self.data['cumulative'] = {}
+                return
+
+            dates = np.array(all_dates, dtype='datetime64[D]')
+            counts = np.fromiter(
+                (c for rd in repos for c in rd['daily_clones']['counts']),
+                dtype=np.int64, count=len(all_dates)
+            )
+            order = np.argsort(dates, kind='stable')
+            uniq, idx = np.unique(dates[order], return_index=True)
+            per_day = np.add.reduceat(counts[order], idx)
+            running = np.cumsum(per_day)
+
+            self.data['cumulative'] = {
+                str(date): {'total_clones': int(total), 'daily_clones': int(day)}
+                for date, total, day in zip(np.datetime_as_string(uniq, unit='D'), running, per_day)
             }
+            return
+
+        # Pure-Python fallback: Counter for the per-day totals, accumulate
+        # for the running total — both C-implemented.
+        # Note: We can't accurately track unique users across repos,
+        # so only clone counts are aggregated.
+        per_day = Counter()
+        for repo_data in repos:
+            daily = repo_data['daily_clones']
+            for date, count in zip(daily['dates'], daily['counts']):
+                per_day[date] += count
+
+        sorted_dates = sorted(per_day)
+        running = accumulate(per_day[d] for d in sorted_dates)
+
+        self.data['cumulative'] = {
+            date: {'total_clones': total, 'daily_clones': per_day[date]}
+            for date, total in zip(sorted_dates, running)
+        }
     
     def run(self):
         """Main execution function"""
@@ -154,13 +432,20 @@ class CloneTracker:
         print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"👤 User: {self.username}\n")
         
-        # Fetch all repositories
-        repos = self.get_all_repositories()
-        
-        # Process each repository
+        # Fetch all repository names (GraphQL projection, REST as fallback)
+        repo_names = self.fetch_repo_names_graphql()
+        if repo_names is None:
+            repo_names = [repo['name'] for repo in self.get_all_repositories()]
+
+        # Process repositories concurrently (I/O-bound, each hits the traffic API).
+        # Prefer multiplexing all calls over one HTTP/2 connection when httpx
+        # is installed; otherwise fan out over the thread pool.
         print("\n📊 Fetching clone statistics...\n")
-        for repo in repos:
-            self.process_repository(repo['name'])
+        if httpx is not None:
+            self.fetch_traffic_http2(repo_names)
+        else:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(self.process_repository, repo_names))
         
         # Calculate cumulative statistics
         print("\n🧮 Calculating cumulative statistics...")
@@ -170,7 +455,7 @@ class CloneTracker:
         self.save_data()
         
         # Print summary
-        total_repos_with_data = len([r for r in self.data['repositories'].values() if r['daily_clones']])
+        total_repos_with_data = len([r for r in self.data['repositories'].values() if r['daily_clones']['dates']])
         total_days_tracked = len(self.data['cumulative'])
         
         if total_days_tracked > 0:
@@ -181,7 +466,7 @@ class CloneTracker:
         
         print(f"\n" + "="*50)
         print(f"📈 Summary:")
-        print(f"  • Repositories with clone data: {total_repos_with_data}/{len(repos)}")
+        print(f"  • Repositories with clone data: {total_repos_with_data}/{len(repo_names)}")
         print(f"  • Days tracked: {total_days_tracked}")
         print(f"  • Total clones (cumulative): {total_clones}")
         print("="*50 + "\n")
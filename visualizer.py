@@ -4,14 +4,51 @@ GitHub Clone Statistics Visualizer
 Generates graphs and charts from collected clone data.
 """
 
+import functools
+import hashlib
 import json
 import os
-from datetime import datetime
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for GitHub Actions
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from collections import defaultdict
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# matplotlib (and the numpy it drags in) costs ~400ms to import, which is
+# wasted when only the markdown summary is regenerated — imported lazily
+np = None
+plt = None
+mdates = None
+
+
+def _ensure_mpl():
+    """Import numpy/matplotlib on first plot and apply the chart style"""
+    global np, plt, mdates
+    if plt is not None:
+        return
+
+    # Writable font-cache dir for cold containers
+    config_dir = os.path.join(tempfile.gettempdir(), 'mplconfig')
+    os.makedirs(config_dir, exist_ok=True)
+    os.environ.setdefault('MPLCONFIGDIR', config_dir)
+
+    import numpy
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for GitHub Actions
+    import matplotlib.pyplot
+    import matplotlib.dates
+
+    np = numpy
+    plt = matplotlib.pyplot
+    mdates = matplotlib.dates
+
+    plt.style.use('seaborn-v0_8-darkgrid')
 
 
 class CloneVisualizer:
@@ -19,35 +56,121 @@ class CloneVisualizer:
         self.data_file = data_file
         self.output_dir = 'graphs'
         self.data = self.load_data()
-        
+
+        # Fingerprint of the loaded data; outputs whose sidecar hash matches
+        # were generated from identical data and can be skipped
+        self._fingerprint = self._data_fingerprint() if self.data else None
+
         # Create output directory
         os.makedirs(self.output_dir, exist_ok=True)
-        
-        # Set style
-        plt.style.use('seaborn-v0_8-darkgrid')
+
+        # Shared figure, created on first plot (see _ensure_figure)
+        self._fig = None
+        self._ax = None
+
+    def _ensure_figure(self):
+        """Create the one reusable figure on first use
+
+        A fresh plt.subplots() per chart pays matplotlib's figure-init cost
+        four times. Fixed margins replace bbox_inches='tight', which forces
+        a second render pass.
+        """
+        if self._fig is None:
+            _ensure_mpl()
+            self._fig, self._ax = plt.subplots(figsize=(12, 6))
+            self._fig.subplots_adjust(left=0.08, right=0.98, top=0.92, bottom=0.22)
     
     def load_data(self):
-        """Load clone data from JSON file"""
-        if not os.path.exists(self.data_file):
+        """Load clone data, preferring the zstd-compressed variant"""
+        zst_file = self.data_file + '.zst'
+        if zstandard is None and os.path.exists(zst_file):
+            print(f"⚠️  Warning: {zst_file} exists but the zstandard package is not installed; "
+                  f"falling back to {self.data_file}, which may be stale — install zstandard")
+        if zstandard is not None and os.path.exists(zst_file):
+            with open(zst_file, 'rb') as f:
+                raw = zstandard.ZstdDecompressor().decompress(f.read())
+        elif os.path.exists(self.data_file):
+            with open(self.data_file, 'rb') as f:
+                raw = f.read()
+        else:
             print(f"❌ Error: {self.data_file} not found. Run github_clone_tracker.py first.")
             return None
-        
-        with open(self.data_file, 'r') as f:
-            return json.load(f)
-    
+
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+        # Accept legacy files where daily_clones was a dict keyed by date
+        # instead of the parallel-array layout the tracker writes now
+        for repo_data in data.get('repositories', {}).values():
+            daily = repo_data.get('daily_clones', {})
+            if 'dates' not in daily:
+                dates = sorted(daily)
+                repo_data['daily_clones'] = {
+                    'dates': dates,
+                    'counts': [daily[d]['count'] for d in dates],
+                    'uniques': [daily[d]['uniques'] for d in dates]
+                }
+
+        return data
+
+    def _data_fingerprint(self):
+        """Stable blake2b hash of the loaded data"""
+        if orjson is not None:
+            payload = orjson.dumps(self.data, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(self.data, sort_keys=True).encode()
+        return hashlib.blake2b(payload).hexdigest()
+
+    def _is_current(self, output_path):
+        """Check whether output_path was already generated from this run's data"""
+        hash_path = output_path + '.hash'
+        if os.path.exists(output_path) and os.path.exists(hash_path):
+            with open(hash_path) as f:
+                return f.read().strip() == self._fingerprint
+        return False
+
+    def _mark_current(self, output_path):
+        """Record the data fingerprint next to a freshly written output"""
+        with open(output_path + '.hash', 'w') as f:
+            f.write(self._fingerprint)
+
+    @functools.cached_property
+    def repo_totals(self):
+        """Total clones per repository (repos with zero clones excluded)"""
+        totals = {}
+        for repo_name, repo_data in self.data['repositories'].items():
+            total = sum(repo_data['daily_clones']['counts'])
+            if total > 0:
+                totals[repo_name] = total
+        return totals
+
+    @functools.cached_property
+    def sorted_repo_totals(self):
+        """repo_totals as a list of (name, total), highest first"""
+        return sorted(self.repo_totals.items(), key=lambda x: x[1], reverse=True)
+
     def plot_cumulative_clones(self):
         """Generate cumulative total clones graph"""
         if not self.data or not self.data['cumulative']:
             print("⚠️  No cumulative data available")
             return
-        
+
+        output_path = os.path.join(self.output_dir, 'cumulative_clones.png')
+        if self._is_current(output_path):
+            print(f"⏭️  Up to date: {output_path}")
+            return
+
+        self._ensure_figure()
         dates = sorted(self.data['cumulative'].keys())
-        totals = [self.data['cumulative'][d]['total_clones'] for d in dates]
-        
-        # Convert dates to datetime objects
-        date_objects = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
+        totals = np.fromiter(
+            (self.data['cumulative'][d]['total_clones'] for d in dates),
+            dtype=np.int64, count=len(dates)
+        )
+
+        # ISO dates parse vectorized as datetime64, which matplotlib accepts natively
+        date_objects = np.array(dates, dtype='datetime64[D]').astype('datetime64[ms]')
+
+        ax = self._ax
+        ax.clear()
         ax.plot(date_objects, totals, marker='o', linewidth=2, markersize=4, color='#2E86AB')
         ax.fill_between(date_objects, totals, alpha=0.3, color='#2E86AB')
         
@@ -58,15 +181,13 @@ class CloneVisualizer:
         # Format x-axis
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-        plt.xticks(rotation=45, ha='right')
-        
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
         ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.output_dir, 'cumulative_clones.png')
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
-        
+
+        self._fig.savefig(output_path, dpi=150)
+        self._mark_current(output_path)
+
         print(f"✅ Saved: {output_path}")
     
     def plot_daily_activity(self):
@@ -74,14 +195,23 @@ class CloneVisualizer:
         if not self.data or not self.data['cumulative']:
             print("⚠️  No cumulative data available")
             return
-        
+
+        output_path = os.path.join(self.output_dir, 'daily_activity.png')
+        if self._is_current(output_path):
+            print(f"⏭️  Up to date: {output_path}")
+            return
+
+        self._ensure_figure()
         dates = sorted(self.data['cumulative'].keys())
-        daily_clones = [self.data['cumulative'][d]['daily_clones'] for d in dates]
-        
-        # Convert dates to datetime objects
-        date_objects = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
+        daily_clones = np.fromiter(
+            (self.data['cumulative'][d]['daily_clones'] for d in dates),
+            dtype=np.int64, count=len(dates)
+        )
+
+        date_objects = np.array(dates, dtype='datetime64[D]').astype('datetime64[ms]')
+
+        ax = self._ax
+        ax.clear()
         ax.bar(date_objects, daily_clones, color='#A23B72', alpha=0.7, edgecolor='black')
         
         ax.set_xlabel('Date', fontsize=12, fontweight='bold')
@@ -91,15 +221,13 @@ class CloneVisualizer:
         # Format x-axis
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-        plt.xticks(rotation=45, ha='right')
-        
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
         ax.grid(True, alpha=0.3, axis='y')
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.output_dir, 'daily_activity.png')
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
-        
+
+        self._fig.savefig(output_path, dpi=150)
+        self._mark_current(output_path)
+
         print(f"✅ Saved: {output_path}")
     
     def plot_repository_breakdown(self):
@@ -108,22 +236,23 @@ class CloneVisualizer:
             print("⚠️  No repository data available")
             return
         
-        # Calculate total clones per repository
-        repo_totals = {}
-        for repo_name, repo_data in self.data['repositories'].items():
-            total = sum(day['count'] for day in repo_data['daily_clones'].values())
-            if total > 0:  # Only include repos with clones
-                repo_totals[repo_name] = total
-        
-        if not repo_totals:
+        if not self.repo_totals:
             print("⚠️  No repository clone data available")
             return
-        
-        # Sort by total clones (descending) and take top 15
-        sorted_repos = sorted(repo_totals.items(), key=lambda x: x[1], reverse=True)[:15]
+
+        output_path = os.path.join(self.output_dir, 'repository_breakdown.png')
+        if self._is_current(output_path):
+            print(f"⏭️  Up to date: {output_path}")
+            return
+
+        # Take top 15 by total clones
+        sorted_repos = self.sorted_repo_totals[:15]
         repos, totals = zip(*sorted_repos)
         
-        fig, ax = plt.subplots(figsize=(12, 8))
+        self._ensure_figure()
+        ax = self._ax
+        ax.clear()
+        self._fig.set_size_inches(12, 8)
         bars = ax.barh(repos, totals, color='#F18F01', edgecolor='black', alpha=0.8)
         
         # Add value labels on bars
@@ -137,12 +266,13 @@ class CloneVisualizer:
         ax.set_title('🏆 Top Repositories by Clone Count', fontsize=14, fontweight='bold', pad=20)
         
         ax.grid(True, alpha=0.3, axis='x')
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.output_dir, 'repository_breakdown.png')
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
-        
+
+        # bbox_inches='tight' for this chart only: repo names are arbitrarily
+        # long, so no fixed left margin fits them reliably
+        self._fig.savefig(output_path, dpi=150, bbox_inches='tight')
+        self._fig.set_size_inches(12, 6)
+        self._mark_current(output_path)
+
         print(f"✅ Saved: {output_path}")
     
     def plot_repository_trend(self):
@@ -151,37 +281,30 @@ class CloneVisualizer:
             print("⚠️  No repository data available")
             return
         
-        # Calculate total clones per repository
-        repo_totals = {}
-        for repo_name, repo_data in self.data['repositories'].items():
-            total = sum(day['count'] for day in repo_data['daily_clones'].values())
-            if total > 0:
-                repo_totals[repo_name] = total
-        
         # Get top 5 repositories
-        top_repos = sorted(repo_totals.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_repos = self.sorted_repo_totals[:5]
         
         if not top_repos:
             print("⚠️  No repository clone data available for trend chart")
             return
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
+
+        output_path = os.path.join(self.output_dir, 'repository_trends.png')
+        if self._is_current(output_path):
+            print(f"⏭️  Up to date: {output_path}")
+            return
+
+        self._ensure_figure()
+        ax = self._ax
+        ax.clear()
+
         colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E']
         
         for idx, (repo_name, _) in enumerate(top_repos):
-            repo_data = self.data['repositories'][repo_name]['daily_clones']
-            
-            # Build cumulative data for this repo
-            dates = sorted(repo_data.keys())
-            cumulative = []
-            total = 0
-            
-            for date in dates:
-                total += repo_data[date]['count']
-                cumulative.append(total)
-            
-            date_objects = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
+            daily = self.data['repositories'][repo_name]['daily_clones']
+
+            # Build cumulative data for this repo (dates are already sorted)
+            cumulative = np.cumsum(daily['counts'])
+            date_objects = np.array(daily['dates'], dtype='datetime64[D]').astype('datetime64[ms]')
             
             ax.plot(date_objects, cumulative, marker='o', linewidth=2, 
                    markersize=3, label=repo_name, color=colors[idx % len(colors)])
@@ -193,23 +316,26 @@ class CloneVisualizer:
         # Format x-axis
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-        plt.xticks(rotation=45, ha='right')
-        
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
         ax.legend(loc='upper left', framealpha=0.9)
         ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.output_dir, 'repository_trends.png')
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
-        
+
+        self._fig.savefig(output_path, dpi=150)
+        self._mark_current(output_path)
+
         print(f"✅ Saved: {output_path}")
     
     def generate_stats_summary(self):
         """Generate a text summary of statistics"""
         if not self.data:
             return
-        
+
+        output_path = os.path.join(self.output_dir, 'STATS_SUMMARY.md')
+        if self._is_current(output_path):
+            print(f"⏭️  Up to date: {output_path}")
+            return
+
         summary_lines = []
         summary_lines.append("# 📊 Clone Statistics Summary\n")
         summary_lines.append(f"**Last Updated:** {self.data.get('last_updated', 'Unknown')}\n\n")
@@ -226,44 +352,43 @@ class CloneVisualizer:
             summary_lines.append(f"- **Average Daily Clones:** {total_clones / days_tracked:.1f}\n\n")
         
         # Repository stats
-        repos_with_data = [r for r in self.data['repositories'].values() if r['daily_clones']]
+        repos_with_data = [r for r in self.data['repositories'].values() if r['daily_clones']['dates']]
         summary_lines.append(f"## Repository Statistics\n")
         summary_lines.append(f"- **Repositories Tracked:** {len(repos_with_data)}\n\n")
         
         # Top repositories
-        if self.data['repositories']:
-            repo_totals = {}
-            for repo_name, repo_data in self.data['repositories'].items():
-                total = sum(day['count'] for day in repo_data['daily_clones'].values())
-                if total > 0:
-                    repo_totals[repo_name] = total
-            
-            if repo_totals:
-                summary_lines.append("## Top 10 Repositories by Clones\n")
-                sorted_repos = sorted(repo_totals.items(), key=lambda x: x[1], reverse=True)[:10]
-                
-                for idx, (repo, count) in enumerate(sorted_repos, 1):
-                    summary_lines.append(f"{idx}. **{repo}**: {count:,} clones\n")
+        if self.repo_totals:
+            summary_lines.append("## Top 10 Repositories by Clones\n")
+            sorted_repos = self.sorted_repo_totals[:10]
+
+            for idx, (repo, count) in enumerate(sorted_repos, 1):
+                summary_lines.append(f"{idx}. **{repo}**: {count:,} clones\n")
         
-        output_path = os.path.join(self.output_dir, 'STATS_SUMMARY.md')
         with open(output_path, 'w') as f:
             f.writelines(summary_lines)
-        
+        self._mark_current(output_path)
+
         print(f"✅ Saved: {output_path}")
     
-    def run(self):
-        """Generate all visualizations"""
+    def run(self, plots=True, summary=True):
+        """Generate visualizations — charts, the text summary, or both
+
+        Callers that only need the markdown summary can pass plots=False
+        and never pay the matplotlib import.
+        """
         if not self.data:
             return
-        
+
         print("🎨 Generating visualizations...\n")
-        
-        self.plot_cumulative_clones()
-        self.plot_daily_activity()
-        self.plot_repository_breakdown()
-        self.plot_repository_trend()
-        self.generate_stats_summary()
-        
+
+        if plots:
+            self.plot_cumulative_clones()
+            self.plot_daily_activity()
+            self.plot_repository_breakdown()
+            self.plot_repository_trend()
+        if summary:
+            self.generate_stats_summary()
+
         print(f"\n✨ All visualizations saved to '{self.output_dir}/' directory")
 
 